@@ -4,12 +4,12 @@
 from __future__ import annotations
 
 import argparse
-import json
 import shutil
 import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
+from typing import AbstractSet, AnyStr
 
 DEFAULT_EXCLUDE_PREFIXES = (
     "agent/checkpoints/",
@@ -28,6 +28,11 @@ DEFAULT_EXCLUDE_FILES = {
     "agent/sync_tail.log",
 }
 
+_EXCLUDE_PREFIXES_BYTES = tuple(prefix.encode("utf-8") for prefix in DEFAULT_EXCLUDE_PREFIXES)
+_EXCLUDE_FILES_BYTES = frozenset(path.encode("utf-8") for path in DEFAULT_EXCLUDE_FILES)
+
+_GH_PATH = shutil.which("gh") or ""
+
 
 def run_cmd(cmd: list[str], cwd: Path, capture_output: bool = False) -> subprocess.CompletedProcess[str]:
     return subprocess.run(
@@ -45,34 +50,64 @@ def git_output(repo: Path, args: list[str]) -> tuple[int, str]:
     return proc.returncode, output
 
 
-def _should_skip(path: str, exclude_prefixes: tuple[str, ...], exclude_files: set[str]) -> bool:
-    if path in exclude_files:
-        return True
-    for prefix in exclude_prefixes:
-        if path.startswith(prefix):
-            return True
-    return False
-
-
-def collect_changed_paths(repo: Path, scope: str) -> list[str]:
-    commands = [
-        ["diff", "--name-only", "--", scope],
-        ["diff", "--cached", "--name-only", "--", scope],
-        ["ls-files", "--others", "--exclude-standard", "--", scope],
-    ]
-    seen: set[str] = set()
-    merged: list[str] = []
-    for cmd in commands:
-        rc, output = git_output(repo, cmd)
-        if rc not in (0, 1):
+def git_output_bytes(repo: Path, args: list[str]) -> tuple[int, bytes]:
+    proc = subprocess.run(["git", *args], cwd=str(repo), check=False, capture_output=True)
+    return proc.returncode, proc.stdout or b""
+
+
+def _should_skip(path: AnyStr, exclude_prefixes: tuple[AnyStr, ...], exclude_files: AbstractSet[AnyStr]) -> bool:
+    # str/bytes.startswith takes the whole prefix tuple and scans it in C.
+    return path in exclude_files or path.startswith(exclude_prefixes)
+
+
+def parse_porcelain_status(
+    data: bytes,
+    exclude_prefixes: tuple[bytes, ...] = (),
+    exclude_files: AbstractSet[bytes] = frozenset(),
+) -> list[tuple[str, str]]:
+    """Parse `git status --porcelain=v1 -z` output into (XY, path) entries.
+
+    Excluded paths are dropped while still raw bytes so only kept paths get decoded.
+    """
+    entries: list[tuple[str, str]] = []
+    records = iter(data.split(b"\x00"))
+    for record in records:
+        if len(record) < 4:
             continue
-        for line in output.splitlines():
-            path = line.strip()
-            if not path or path in seen:
-                continue
-            seen.add(path)
-            merged.append(path)
-    return merged
+        xy = record[:2].decode("ascii", "replace")
+        if xy[0] in "RC":
+            # Renames/copies carry the original path as the next record.
+            next(records, None)
+        path = record[3:]
+        if xy == "!!" or _should_skip(path, exclude_prefixes, exclude_files):
+            continue
+        entries.append((xy, path.decode("utf-8", "surrogateescape")))
+    return entries
+
+
+def collect_changed_entries(repo: Path, scope: str) -> list[tuple[str, str]]:
+    rc, output = git_output_bytes(repo, ["status", "--porcelain=v1", "-z", "--untracked-files=all", "--", scope])
+    if rc != 0:
+        return []
+    return parse_porcelain_status(output, _EXCLUDE_PREFIXES_BYTES, _EXCLUDE_FILES_BYTES)
+
+
+def paths_needing_add(entries: list[tuple[str, str]]) -> list[str]:
+    """Return porcelain paths whose worktree side still differs from the index."""
+    return [path for xy, path in entries if xy[1] != " "]
+
+
+def stage_paths(repo: Path, paths: list[str]) -> int:
+    """Stage paths by streaming them to one `git update-index` over stdin instead of argv."""
+    payload = b"".join(path.encode("utf-8", "surrogateescape") + b"\x00" for path in paths)
+    proc = subprocess.run(
+        ["git", "update-index", "--add", "--remove", "-z", "--stdin"],
+        cwd=str(repo),
+        check=False,
+        input=payload,
+        capture_output=True,
+    )
+    return proc.returncode
 
 
 def current_branch(repo: Path) -> str:
@@ -82,10 +117,11 @@ def current_branch(repo: Path) -> str:
     return output
 
 
-def switch_to_work_branch(repo: Path, base: str, prefix: str) -> str:
+def switch_to_work_branch(repo: Path, base: str, prefix: str) -> tuple[str, bool]:
+    """Return (branch, created) where created is True for a freshly made branch."""
     branch = current_branch(repo)
     if branch not in (base, "HEAD"):
-        return branch
+        return branch, False
     timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
     candidate = f"{prefix}/{timestamp}"
     rc = run_cmd(["git", "checkout", "-b", candidate], repo).returncode
@@ -94,7 +130,7 @@ def switch_to_work_branch(repo: Path, base: str, prefix: str) -> str:
         rc = run_cmd(["git", "checkout", "-b", candidate], repo).returncode
         if rc != 0:
             raise RuntimeError("unable to create work branch")
-    return candidate
+    return candidate, True
 
 
 def has_staged_changes(repo: Path) -> bool:
@@ -116,37 +152,35 @@ def read_body(body_file: Path) -> str:
 
 
 def find_existing_pr(base: str, head: str) -> str:
+    # Let gh extract the URL so only a single line crosses the pipe.
     proc = subprocess.run(
-        ["gh", "pr", "list", "--base", base, "--head", head, "--json", "url", "--limit", "1"],
+        [_GH_PATH, "pr", "list", "--base", base, "--head", head, "--json", "url", "--limit", "1"]
+        + ["--jq", ".[0].url // empty"],
         check=False,
         text=True,
         capture_output=True,
     )
     if proc.returncode != 0:
         return ""
-    try:
-        data = json.loads(proc.stdout or "[]")
-    except json.JSONDecodeError:
-        return ""
-    if isinstance(data, list) and data:
-        first = data[0]
-        if isinstance(first, dict):
-            url = first.get("url")
-            if isinstance(url, str):
-                return url
-    return ""
+    return (proc.stdout or "").strip()
 
 
-def create_or_get_pr(repo: Path, base: str, head: str, title: str, body: str) -> str:
-    existing = find_existing_pr(base, head)
-    if existing:
-        return existing
+def create_or_get_pr(repo: Path, base: str, head: str, title: str, body: str, head_is_new: bool = False) -> str:
+    # A branch created in this run cannot have a PR yet, so skip the lookup round-trip.
+    if not head_is_new:
+        existing = find_existing_pr(base, head)
+        if existing:
+            return existing
     proc = run_cmd(
-        ["gh", "pr", "create", "--base", base, "--head", head, "--title", title, "--body", body],
+        [_GH_PATH, "pr", "create", "--base", base, "--head", head, "--title", title, "--body", body],
         repo,
         capture_output=True,
     )
     if proc.returncode != 0:
+        if head_is_new and "already exists" in (proc.stderr or ""):
+            existing = find_existing_pr(base, head)
+            if existing:
+                return existing
         detail = (proc.stdout or "").strip() or (proc.stderr or "").strip() or "gh pr create failed"
         raise RuntimeError(detail)
     output = (proc.stdout or "").strip()
@@ -157,7 +191,7 @@ def create_or_get_pr(repo: Path, base: str, head: str, title: str, body: str) ->
 
 def auto_merge_pr(repo: Path, pr_url: str) -> None:
     target = pr_url if pr_url else ""
-    cmd = ["gh", "pr", "merge", "--auto", "--squash", "--delete-branch"]
+    cmd = [_GH_PATH, "pr", "merge", "--auto", "--squash", "--delete-branch"]
     if target:
         cmd.append(target)
     proc = run_cmd(cmd, repo, capture_output=True)
@@ -191,28 +225,25 @@ def main() -> int:
         print("autopr: repo does not exist", file=sys.stderr)
         return 2
 
-    changed = collect_changed_paths(repo, args.scope)
-    eligible = [
-        path
-        for path in changed
-        if not _should_skip(path, DEFAULT_EXCLUDE_PREFIXES, DEFAULT_EXCLUDE_FILES)
-    ]
-
-    if not eligible:
+    entries = collect_changed_entries(repo, args.scope)
+    if not entries:
         print("autopr: no eligible changes")
         return 0
 
+    # Paths already staged with a clean worktree need no `git add` (e.g. on a rerun).
+    to_add = paths_needing_add(entries)
+
     try:
-        ensure_origin(repo)
-        branch = switch_to_work_branch(repo, args.base, args.branch_prefix)
+        branch, branch_created = switch_to_work_branch(repo, args.base, args.branch_prefix)
     except RuntimeError as exc:
         print(f"autopr: {exc}", file=sys.stderr)
         return 2
 
-    add_rc = run_cmd(["git", "add", "--", *eligible], repo).returncode
-    if add_rc != 0:
-        print("autopr: git add failed", file=sys.stderr)
-        return 2
+    if to_add:
+        add_rc = stage_paths(repo, to_add)
+        if add_rc != 0:
+            print("autopr: git add failed", file=sys.stderr)
+            return 2
 
     if not has_staged_changes(repo):
         print("autopr: no staged changes after filtering")
@@ -225,16 +256,21 @@ def main() -> int:
 
     push_rc = run_cmd(["git", "push", "-u", "origin", branch], repo).returncode
     if push_rc != 0:
+        try:
+            ensure_origin(repo)
+        except RuntimeError as exc:
+            print(f"autopr: git push failed: {exc}", file=sys.stderr)
+            return 2
         print("autopr: git push failed", file=sys.stderr)
         return 2
 
-    if shutil.which("gh") is None:
+    if not _GH_PATH:
         print("autopr: gh CLI not found", file=sys.stderr)
         return 127
 
     body = read_body(repo / args.body_file)
     try:
-        pr_url = create_or_get_pr(repo, args.base, branch, args.title, body)
+        pr_url = create_or_get_pr(repo, args.base, branch, args.title, body, head_is_new=branch_created)
         if args.auto_merge and args.mode == "dev":
             auto_merge_pr(repo, pr_url)
     except RuntimeError as exc:
@@ -5,9 +5,11 @@ from __future__ import annotations
 
 import argparse
 import json
+import operator
+import re
 from datetime import datetime
 from pathlib import Path
-from typing import Sequence
+from typing import Callable, List, Sequence
 
 HANDOFF_VERSION = "1.0"
 ALLOWED_PRIORITIES = {"low", "medium", "high", "critical"}
@@ -28,13 +30,25 @@ REQUIRED_FIELDS = (
     "created_at",
 )
 
+Validator = Callable[[object, str, List[str]], None]
 
-def now_iso() -> str:
-    return datetime.now().isoformat(timespec="seconds")
+# Shape emitted by now_iso(). Days stop at 28 so every match is a real calendar date;
+# anything else (other days, fractions, "Z", date-only) still goes through fromisoformat.
+_ISO_FAST_RE = re.compile(
+    r"(?!0000)\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|1\d|2[0-8])T(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d"
+    r"(?:[+-](?:[01]\d|2[0-3]):[0-5]\d)?",
+    re.ASCII,
+)
+
+_HOP_FIELDS = operator.itemgetter("from_agent", "to_agent", "status")
+
+
+def now_iso(now: datetime | None = None) -> str:
+    return (now or datetime.now()).isoformat(timespec="seconds")
 
 
-def generate_handoff_id(prefix: str = "handoff") -> str:
-    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+def generate_handoff_id(prefix: str = "handoff", *, now: datetime | None = None) -> str:
+    ts = (now or datetime.now()).strftime("%Y%m%d-%H%M%S")
     return f"{prefix}-{ts}"
 
 
@@ -42,7 +56,12 @@ def _is_non_empty_text(value: object) -> bool:
     return isinstance(value, str) and bool(value.strip())
 
 
-def _validate_str_list(name: str, value: object, errors: list[str]) -> None:
+def _validate_text(value: object, name: str, errors: list[str]) -> None:
+    if not _is_non_empty_text(value):
+        errors.append(f"{name} must be a non-empty string")
+
+
+def _validate_str_list(value: object, name: str, errors: list[str]) -> None:
     if not isinstance(value, list) or not value:
         errors.append(f"{name} must be a non-empty string list")
         return
@@ -57,6 +76,8 @@ def _validate_iso8601(value: object, field_name: str, errors: list[str]) -> None
         errors.append(f"{field_name} must be a non-empty string")
         return
     candidate = value.strip()
+    if _ISO_FAST_RE.fullmatch(candidate):
+        return
     normalized = candidate[:-1] + "+00:00" if candidate.endswith("Z") else candidate
     try:
         datetime.fromisoformat(normalized)
@@ -64,6 +85,52 @@ def _validate_iso8601(value: object, field_name: str, errors: list[str]) -> None
         errors.append(f"{field_name} must be ISO-8601 datetime")
 
 
+def _validate_version(value: object, name: str, errors: list[str]) -> None:
+    if value != HANDOFF_VERSION:
+        errors.append(f"{name} must be '{HANDOFF_VERSION}'")
+
+
+def _validate_choice(allowed: set[str]) -> Validator:
+    def check(value: object, name: str, errors: list[str]) -> None:
+        if not isinstance(value, str) or value not in allowed:
+            errors.append(f"{name} must be one of: {sorted(allowed)}")
+
+    return check
+
+
+def _validate_tags(value: object, name: str, errors: list[str]) -> None:
+    if not isinstance(value, list) or any(not _is_non_empty_text(tag) for tag in value):
+        errors.append(f"{name} must be a string list when provided")
+
+
+def _validate_object(value: object, name: str, errors: list[str]) -> None:
+    if not isinstance(value, dict):
+        errors.append(f"{name} must be an object when provided")
+
+
+# Field validators run in this order; optional ones only when the field is present and not null.
+_SCHEMA: tuple[tuple[str, Validator], ...] = (
+    ("version", _validate_version),
+    ("handoff_id", _validate_text),
+    ("from_agent", _validate_text),
+    ("to_agent", _validate_text),
+    ("objective", _validate_text),
+    ("inputs", _validate_str_list),
+    ("deliverables", _validate_str_list),
+    ("acceptance_criteria", _validate_str_list),
+    ("risks", _validate_str_list),
+    ("rollback_plan", _validate_text),
+    ("priority", _validate_choice(ALLOWED_PRIORITIES)),
+    ("status", _validate_choice(ALLOWED_STATUS)),
+    ("created_at", _validate_iso8601),
+)
+_OPTIONAL_SCHEMA: tuple[tuple[str, Validator], ...] = (
+    ("due_at", _validate_iso8601),
+    ("tags", _validate_tags),
+    ("metadata", _validate_object),
+)
+
+
 def validate_handoff(payload: object) -> tuple[bool, list[str]]:
     errors: list[str] = []
     if not isinstance(payload, dict):
@@ -76,51 +143,27 @@ def validate_handoff(payload: object) -> tuple[bool, list[str]]:
     if errors:
         return False, errors
 
-    if payload.get("version") != HANDOFF_VERSION:
-        errors.append(f"version must be '{HANDOFF_VERSION}'")
-    if not _is_non_empty_text(payload.get("handoff_id")):
-        errors.append("handoff_id must be a non-empty string")
-    if not _is_non_empty_text(payload.get("from_agent")):
-        errors.append("from_agent must be a non-empty string")
-    if not _is_non_empty_text(payload.get("to_agent")):
-        errors.append("to_agent must be a non-empty string")
-    if _is_non_empty_text(payload.get("from_agent")) and payload.get("from_agent") == payload.get("to_agent"):
-        errors.append("from_agent and to_agent must be different")
-    if not _is_non_empty_text(payload.get("objective")):
-        errors.append("objective must be a non-empty string")
-    _validate_str_list("inputs", payload.get("inputs"), errors)
-    _validate_str_list("deliverables", payload.get("deliverables"), errors)
-    _validate_str_list("acceptance_criteria", payload.get("acceptance_criteria"), errors)
-    _validate_str_list("risks", payload.get("risks"), errors)
-    if not _is_non_empty_text(payload.get("rollback_plan")):
-        errors.append("rollback_plan must be a non-empty string")
-    priority = payload.get("priority")
-    if not isinstance(priority, str) or priority not in ALLOWED_PRIORITIES:
-        errors.append(f"priority must be one of: {sorted(ALLOWED_PRIORITIES)}")
-    status = payload.get("status")
-    if not isinstance(status, str) or status not in ALLOWED_STATUS:
-        errors.append(f"status must be one of: {sorted(ALLOWED_STATUS)}")
-    _validate_iso8601(payload.get("created_at"), "created_at", errors)
-
-    due_at = payload.get("due_at")
-    if due_at is not None:
-        _validate_iso8601(due_at, "due_at", errors)
-
-    tags = payload.get("tags")
-    if tags is not None and (not isinstance(tags, list) or any(not _is_non_empty_text(tag) for tag in tags)):
-        errors.append("tags must be a string list when provided")
-
-    metadata = payload.get("metadata")
-    if metadata is not None and not isinstance(metadata, dict):
-        errors.append("metadata must be an object when provided")
+    from_agent = payload["from_agent"]
+    for field, validate in _SCHEMA:
+        value = payload[field]
+        validate(value, field, errors)
+        # Reported right after to_agent's own check, as before the table existed.
+        if field == "to_agent" and _is_non_empty_text(from_agent) and from_agent == value:
+            errors.append("from_agent and to_agent must be different")
+
+    for field, validate in _OPTIONAL_SCHEMA:
+        value = payload.get(field)
+        if value is not None:
+            validate(value, field, errors)
 
     return not errors, errors
 
 
 def build_handoff_template(from_agent: str, to_agent: str, objective: str) -> dict:
+    now = datetime.now()
     return {
         "version": HANDOFF_VERSION,
-        "handoff_id": generate_handoff_id(),
+        "handoff_id": generate_handoff_id(now=now),
         "from_agent": from_agent.strip() or "requester",
         "to_agent": to_agent.strip() or "main",
         "objective": objective.strip() or "TBD objective",
@@ -131,7 +174,7 @@ def build_handoff_template(from_agent: str, to_agent: str, objective: str) -> di
         "rollback_plan": "revert affected files to previous known-good commit",
         "priority": "medium",
         "status": "planned",
-        "created_at": now_iso(),
+        "created_at": now_iso(now),
         "tags": ["handoff", "standardized"],
         "metadata": {},
     }
@@ -164,6 +207,14 @@ def is_route_isolated(expected_key: str, observed_key: str) -> bool:
     return expected_key.strip().lower() == observed_key.strip().lower()
 
 
+def _hop_fields(item: dict) -> tuple[object, object, object]:
+    try:
+        fields: tuple[object, object, object] = _HOP_FIELDS(item)
+    except KeyError:
+        return item.get("from_agent", ""), item.get("to_agent", ""), item.get("status")
+    return fields
+
+
 def evaluate_handoff_convergence(
     history: Sequence[dict],
     max_hops: int = 8,
@@ -172,30 +223,26 @@ def evaluate_handoff_convergence(
     if not history:
         return False, "empty handoff history"
 
+    # One pass in history order, so whichever of "invalid entry" and "ping-pong" comes first is reported.
+    # Each hop is normalized once and carried forward as the previous hop.
     reversals = 0
     seen_done = False
+    prev_from = prev_to = ""
     for index, item in enumerate(history):
         if not isinstance(item, dict):
             return False, f"invalid handoff at index={index}"
-        status = item.get("status")
+        src, dst, status = _hop_fields(item)
         if status == "done":
             seen_done = True
-
-        if index == 0:
-            continue
-        prev = history[index - 1]
-        if not isinstance(prev, dict):
-            return False, f"invalid handoff at index={index - 1}"
-        prev_from = str(prev.get("from_agent", "")).strip()
-        prev_to = str(prev.get("to_agent", "")).strip()
-        curr_from = str(item.get("from_agent", "")).strip()
-        curr_to = str(item.get("to_agent", "")).strip()
-        if prev_from == curr_to and prev_to == curr_from:
-            reversals += 1
-            if reversals > ping_pong_limit:
-                return False, "ping-pong limit exceeded"
-        else:
-            reversals = 0
+        curr_from, curr_to = str(src).strip(), str(dst).strip()
+        if index:
+            if prev_from == curr_to and prev_to == curr_from:
+                reversals += 1
+                if reversals > ping_pong_limit:
+                    return False, "ping-pong limit exceeded"
+            else:
+                reversals = 0
+        prev_from, prev_to = curr_from, curr_to
 
     if seen_done:
         return True, "handoff converged with done status"
@@ -206,10 +253,10 @@ def evaluate_handoff_convergence(
 
 def load_handoff_file(path: Path) -> tuple[dict | None, list[str]]:
     try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
+        payload = json.loads(path.read_bytes())
     except OSError as exc:
         return None, [f"read failed: {exc}"]
-    except json.JSONDecodeError as exc:
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
         return None, [f"invalid json: {exc}"]
     ok, errors = validate_handoff(payload)
     if not ok:
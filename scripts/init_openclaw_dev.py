@@ -6,6 +6,9 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -39,21 +42,23 @@ POLICY_MD = """目标：在保证质量门禁通过的前提下，最小改动
 """
 
 
-STATUS_JSON = {
-    "state": "idle",
-    "last_update": "",
-    "tenant_id": "default",
-    "agent_id": "main",
-    "project_id": "default",
-    "current_step": 0,
-    "current_milestone": 0,
-    "checkpoint_id": "",
-    "last_cmd": "",
-    "last_test_ok": False,
-    "last_error_sig": "",
-    "needs_human": False,
-    "human_question": "",
-}
+# Fixed schema: only the two dynamic values are JSON-encoded at init time.
+STATUS_JSON = """{{
+  "state": "idle",
+  "last_update": {last_update},
+  "tenant_id": "default",
+  "agent_id": "main",
+  "project_id": {project_id},
+  "current_step": 0,
+  "current_milestone": 0,
+  "checkpoint_id": "",
+  "last_cmd": "",
+  "last_test_ok": false,
+  "last_error_sig": "",
+  "needs_human": false,
+  "human_question": ""
+}}
+"""
 
 
 DECISIONS_MD = """# Decisions Needed
@@ -151,11 +156,13 @@ APPROVALS_JSON = """{
 def ensure_openclaw_config(repo: Path, force: bool) -> None:
     config_path = repo / "openclaw.json"
     config: dict = {}
+    original = b""
 
     if config_path.exists():
         try:
-            loaded = json.loads(config_path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
+            original = config_path.read_bytes()
+            loaded = json.loads(original)
+        except (OSError, json.JSONDecodeError, UnicodeDecodeError):
             loaded = {}
         if isinstance(loaded, dict):
             config = loaded
@@ -182,8 +189,11 @@ def ensure_openclaw_config(repo: Path, force: bool) -> None:
     if repo.name.endswith("-repo"):
         mirror_name = repo.name[:-5]
         mirror_rel = f"../skills/{mirror_name}"
-        mirror_abs = (repo / mirror_rel).resolve()
-        if mirror_abs.exists() and mirror_abs.is_dir() and mirror_rel not in add_dirs:
+        try:
+            mirror_is_dir = stat.S_ISDIR(os.stat(repo / mirror_rel).st_mode)
+        except OSError:
+            mirror_is_dir = False
+        if mirror_is_dir and mirror_rel not in add_dirs:
             add_dirs.append(mirror_rel)
 
     supervisor["add_dirs"] = add_dirs
@@ -294,7 +304,10 @@ def ensure_openclaw_config(repo: Path, force: bool) -> None:
         ]
     supervisor["security"] = security
 
-    config_path.write_text(json.dumps(config, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    rendered = (json.dumps(config, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+    # Leave an already up-to-date config untouched (no write, stable mtime).
+    if rendered != original:
+        config_path.write_bytes(rendered)
 
 
 def task_md(task: str) -> str:
@@ -315,10 +328,22 @@ def task_md(task: str) -> str:
 """
 
 
-def write_file(path: Path, content: str, force: bool) -> None:
-    if path.exists() and not force:
+def _write_bytes(spec: tuple[Path, bytes]) -> None:
+    path, payload = spec
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
+
+
+def batched_write(specs: list[tuple[Path, bytes]]) -> None:
+    """Write independent (path, payload) pairs concurrently; the GIL is released around each write."""
+    if not specs:
         return
-    path.write_text(content, encoding="utf-8")
+    with ThreadPoolExecutor(max_workers=min(8, len(specs))) as executor:
+        # list() drains the iterator so the first failed write re-raises here.
+        list(executor.map(_write_bytes, specs))
 
 
 def main() -> None:
@@ -331,26 +356,39 @@ def main() -> None:
     repo = Path(args.repo).expanduser().resolve()
     agent_dir = repo / "agent"
     agent_dir.mkdir(parents=True, exist_ok=True)
-
-    write_file(agent_dir / "COMMANDS.env", COMMANDS_ENV, args.force)
-    write_file(agent_dir / "POLICY.md", POLICY_MD, args.force)
-    write_file(agent_dir / "DECISIONS.md", DECISIONS_MD, args.force)
-    write_file(agent_dir / "RESULT.md", RESULT_MD, args.force)
-    write_file(agent_dir / "PLAN.md", PLAN_MD, args.force)
-    write_file(agent_dir / "TASK.md", task_md(args.task), args.force)
-    write_file(agent_dir / "BLUEPRINT.json", BLUEPRINT_JSON, args.force)
-    write_file(agent_dir / "CONTEXT.json", CONTEXT_JSON, args.force)
-    write_file(agent_dir / "HOT.md", HOT_MD, args.force)
-    write_file(agent_dir / "WARM.md", WARM_MD, args.force)
-    write_file(agent_dir / "COLD.ref.json", COLD_REF_JSON, args.force)
-    write_file(agent_dir / "APPROVALS.json", APPROVALS_JSON, args.force)
+    # One directory listing replaces a stat() per template file.
+    with os.scandir(agent_dir) as entries:
+        existing = frozenset(entry.name for entry in entries)
+
+    templates = (
+        ("COMMANDS.env", COMMANDS_ENV),
+        ("POLICY.md", POLICY_MD),
+        ("DECISIONS.md", DECISIONS_MD),
+        ("RESULT.md", RESULT_MD),
+        ("PLAN.md", PLAN_MD),
+        ("TASK.md", task_md(args.task)),
+        ("BLUEPRINT.json", BLUEPRINT_JSON),
+        ("CONTEXT.json", CONTEXT_JSON),
+        ("HOT.md", HOT_MD),
+        ("WARM.md", WARM_MD),
+        ("COLD.ref.json", COLD_REF_JSON),
+        ("APPROVALS.json", APPROVALS_JSON),
+    )
+    batched_write(
+        [
+            (agent_dir / name, content.encode("utf-8"))
+            for name, content in templates
+            if args.force or name not in existing
+        ]
+    )
 
     status_path = agent_dir / "STATUS.json"
-    if not status_path.exists() or args.force:
-        status = dict(STATUS_JSON)
-        status["last_update"] = datetime.now().isoformat(timespec="seconds")
-        status["project_id"] = repo.name
-        status_path.write_text(json.dumps(status, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    if status_path.name not in existing or args.force:
+        status = STATUS_JSON.format(
+            last_update=json.dumps(datetime.now().isoformat(timespec="seconds")),
+            project_id=json.dumps(repo.name, ensure_ascii=False),
+        )
+        status_path.write_text(status, encoding="utf-8")
 
     ensure_openclaw_config(repo, args.force)
 
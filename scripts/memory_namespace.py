@@ -5,8 +5,11 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import re
+import string
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 DEFAULT_TEMPLATES = {
@@ -20,55 +23,90 @@ DEFAULT_TEMPLATES = {
     "card_dir_template": "brain/tenants/{tenant_id}/agents/{agent_id}/projects/{project_id}/cards/{date}",
     "pack_dir_template": "brain/tenants/{tenant_id}/agents/{agent_id}/projects/{project_id}/packs/{date}",
 }
+IDENTIFIER_CHARS = frozenset(string.ascii_lowercase + string.digits + "._-")
+IDENTIFIER_DISALLOWED_RE = re.compile(r"[^a-z0-9._-]+")
 
 
 def normalize_identifier(value: object, fallback: str) -> str:
     if not isinstance(value, str):
         return fallback
+    return _normalize_text(value, fallback)
+
+
+@lru_cache(maxsize=1024)
+def _normalize_text(value: str, fallback: str) -> str:
     cleaned = value.strip().lower()
     if not cleaned:
         return fallback
-    return re.sub(r"[^a-z0-9._-]+", "-", cleaned)
+    # Already-clean ids (the common case) skip the regex substitution entirely.
+    if cleaned.isascii() and IDENTIFIER_CHARS.issuperset(cleaned):
+        return cleaned
+    return IDENTIFIER_DISALLOWED_RE.sub("-", cleaned)
 
 
 def _resolve_root(root: str) -> Path:
+    # Relative roots depend on the working directory, so it is part of the cache key.
+    return _resolve_root_from(root, os.getcwd())
+
+
+@lru_cache(maxsize=128)
+def _resolve_root_from(root: str, cwd: str) -> Path:
     root_path = Path(root).expanduser()
     if not root_path.is_absolute():
-        root_path = (Path.cwd() / root_path).resolve()
+        root_path = (Path(cwd) / root_path).resolve()
     return root_path
 
 
 def _format_template(template: str, namespace: dict[str, str]) -> str:
+    return _format_template_items(template, tuple(namespace.items()))
+
+
+@lru_cache(maxsize=1024)
+def _format_template_items(template: str, items: tuple[tuple[str, str], ...]) -> str:
     try:
-        return template.format(**namespace)
+        return template.format(**dict(items))
     except KeyError:
         return template
 
 
 def build_namespace(tenant_id: str, agent_id: str, project_id: str, date_value: str | None) -> dict[str, str]:
+    date = (date_value or "").strip() or datetime.now().strftime("%Y-%m-%d")
     return {
         "tenant_id": normalize_identifier(tenant_id, "default"),
         "agent_id": normalize_identifier(agent_id, "main"),
         "project_id": normalize_identifier(project_id, "default"),
-        "date": (date_value or datetime.now().strftime("%Y-%m-%d")).strip() or datetime.now().strftime("%Y-%m-%d"),
+        "date": date,
     }
 
 
+def _join_under(root_path: Path, relative: str, resolve_symlinks: bool) -> Path:
+    path = root_path / relative
+    if resolve_symlinks:
+        return path.resolve()
+    # Lexical normalization only: collapses "." and ".." without an lstat per path component.
+    return Path(os.path.normpath(path))
+
+
 def resolve_paths(
     root: str,
     namespace: dict[str, str],
     templates: dict[str, str] | None = None,
+    resolve_symlinks: bool = False,
 ) -> dict[str, Path]:
     merged_templates = dict(DEFAULT_TEMPLATES)
     if templates:
         merged_templates.update(templates)
 
     root_path = _resolve_root(root)
-    global_memory = (root_path / _format_template(merged_templates["global_memory_template"], namespace)).resolve()
-    daily_index = (root_path / _format_template(merged_templates["daily_index_template"], namespace)).resolve()
-    session_glob = (root_path / _format_template(merged_templates["session_glob_template"], namespace)).resolve()
-    card_dir = (root_path / _format_template(merged_templates["card_dir_template"], namespace)).resolve()
-    pack_dir = (root_path / _format_template(merged_templates["pack_dir_template"], namespace)).resolve()
+
+    def join(key: str) -> Path:
+        return _join_under(root_path, _format_template(merged_templates[key], namespace), resolve_symlinks)
+
+    global_memory = join("global_memory_template")
+    daily_index = join("daily_index_template")
+    session_glob = join("session_glob_template")
+    card_dir = join("card_dir_template")
+    pack_dir = join("pack_dir_template")
 
     return {
         "root": root_path,
@@ -82,10 +120,20 @@ def resolve_paths(
 
 
 def _write_if_missing(path: Path, content: str, force: bool) -> None:
-    if path.exists() and not force:
+    # O_EXCL folds the existence check into the open, so concurrent inits cannot both write.
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if force else os.O_EXCL)
+    try:
+        fd = os.open(path, flags, 0o644)
+    except FileExistsError:
         return
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(path, flags, 0o644)
+        except FileExistsError:
+            return
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        handle.write(content)
 
 
 def _touch_gitkeep(path: Path) -> None:
@@ -100,8 +148,9 @@ def init_namespace(
     namespace: dict[str, str],
     force: bool,
     templates: dict[str, str] | None = None,
+    resolve_symlinks: bool = False,
 ) -> dict[str, Path]:
-    paths = resolve_paths(root, namespace, templates=templates)
+    paths = resolve_paths(root, namespace, templates=templates, resolve_symlinks=resolve_symlinks)
     now_iso = datetime.now().isoformat(timespec="seconds")
     _write_if_missing(
         paths["global_memory"],
@@ -178,6 +227,11 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_TEMPLATES["pack_dir_template"],
         help="Template for pack directory path.",
     )
+    parser.add_argument(
+        "--resolve-symlinks",
+        action="store_true",
+        help="Resolve symlinks in generated paths (default: lexical normalization only).",
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
     subparsers.add_parser("resolve", help="Resolve namespace paths and print JSON.")
@@ -198,9 +252,15 @@ def main() -> int:
     }
 
     if args.command == "init":
-        paths = init_namespace(args.root, namespace, force=bool(args.force), templates=templates)
+        paths = init_namespace(
+            args.root,
+            namespace,
+            force=bool(args.force),
+            templates=templates,
+            resolve_symlinks=bool(args.resolve_symlinks),
+        )
     else:
-        paths = resolve_paths(args.root, namespace, templates=templates)
+        paths = resolve_paths(args.root, namespace, templates=templates, resolve_symlinks=bool(args.resolve_symlinks))
 
     print(json.dumps(_to_jsonable(paths, namespace), ensure_ascii=False, indent=2))
     return 0
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 from pathlib import Path
 
 DEFAULT_CONFIG = {
@@ -24,6 +25,10 @@ FAILURE_STATUS_MARKERS = (
     "codex_timeout",
     "codex_no_progress",
 )
+# Status tokens match markers exactly (codex_timeout_progress is not codex_timeout),
+# so one set-disjointness check replaces the per-marker scan.
+FAILURE_MARKER_SET = frozenset(FAILURE_STATUS_MARKERS)
+TAIL_BLOCK_BYTES = 64 * 1024
 
 
 def _status_tokens(status_raw: object) -> list[str]:
@@ -61,22 +66,39 @@ def _load_config(repo: Path) -> dict:
     return merged
 
 
+def _tail_lines(path: Path, count: int) -> list[bytes]:
+    """Return the last `count` lines of `path`, reading backwards in fixed-size blocks."""
+    blocks: list[bytes] = []
+    newlines = 0
+    with path.open("rb") as fh:
+        pos = fh.seek(0, os.SEEK_END)
+        # count + 1 newlines guarantee the oldest kept line is complete.
+        while pos > 0 and newlines <= count:
+            step = min(TAIL_BLOCK_BYTES, pos)
+            pos -= step
+            fh.seek(pos)
+            block = fh.read(step)
+            newlines += block.count(b"\n")
+            blocks.append(block)
+    return b"".join(reversed(blocks)).splitlines()[-count:]
+
+
 def _load_records(repo: Path, window: int) -> list[dict]:
     path = repo / "memory" / "supervisor_nightly.log"
     if not path.exists():
         return []
     try:
-        lines = path.read_text(encoding="utf-8").splitlines()
+        lines = _tail_lines(path, max(1, window))
     except OSError:
         return []
     records: list[dict] = []
-    for line in lines[-max(1, window):]:
+    for line in lines:
         stripped = line.strip()
         if not stripped:
             continue
         try:
             payload = json.loads(stripped)
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, UnicodeDecodeError):
             continue
         if isinstance(payload, dict):
             records.append(payload)
@@ -88,29 +110,33 @@ def compute_metrics(records: list[dict]) -> dict:
     failures = 0
     route_total = 0
     route_hits = 0
-    prompt_tokens: list[int] = []
-    token_cost_usd: list[float] = []
+    prompt_sum = 0
+    prompt_count = 0
+    cost_sum = 0.0
+    cost_count = 0
     for record in records:
-        status_tokens = _status_tokens(record.get("status", ""))
-        if any(marker in status_tokens for marker in FAILURE_STATUS_MARKERS):
+        get = record.get
+        if not FAILURE_MARKER_SET.isdisjoint(_status_tokens(get("status", ""))):
             failures += 1
         if "route_hit" in record:
             route_total += 1
-            if bool(record.get("route_hit", False)):
+            if bool(get("route_hit", False)):
                 route_hits += 1
-        prompt = record.get("prompt_tokens")
+        prompt = get("prompt_tokens")
         if isinstance(prompt, int):
-            prompt_tokens.append(max(0, prompt))
-        cost = record.get("token_cost_usd")
+            prompt_sum += max(0, prompt)
+            prompt_count += 1
+        cost = get("token_cost_usd")
         if isinstance(cost, (int, float)):
-            token_cost_usd.append(max(0.0, float(cost)))
+            cost_sum += max(0.0, float(cost))
+            cost_count += 1
 
     failure_rate = failures / total if total else 0.0
     route_miss_rate = 0.0
     if route_total > 0:
         route_miss_rate = 1.0 - (route_hits / route_total)
-    avg_prompt_tokens = (sum(prompt_tokens) / len(prompt_tokens)) if prompt_tokens else 0.0
-    avg_token_cost_usd = (sum(token_cost_usd) / len(token_cost_usd)) if token_cost_usd else 0.0
+    avg_prompt_tokens = (prompt_sum / prompt_count) if prompt_count else 0.0
+    avg_token_cost_usd = (cost_sum / cost_count) if cost_count else 0.0
     return {
         "samples": total,
         "failure_rate": failure_rate,
@@ -3,33 +3,44 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import re
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterator
 
 ROOT = Path(__file__).resolve().parents[1]
 MEMORY_ROOT = ROOT / "memory"
 
-ALLOWED_SUFFIXES = {
-    ".md",
-    ".txt",
-    ".log",
-    ".json",
-    ".jsonl",
-    ".yaml",
-    ".yml",
-    ".csv",
-}
-EXCLUDED_NAMES = {".vector_db", ".vector_db_final"}
+ALLOWED_SUFFIXES = frozenset(
+    {
+        ".md",
+        ".txt",
+        ".log",
+        ".json",
+        ".jsonl",
+        ".yaml",
+        ".yml",
+        ".csv",
+    }
+)
+EXCLUDED_NAMES = frozenset({".vector_db", ".vector_db_final"})
 MAX_FILE_BYTES = 1_000_000
 MAX_CHUNK_CHARS = 800
 MAX_SNIPPET_CHARS = 220
 DEFAULT_TOP_PROJECTS = 3
 DEFAULT_TOP_CHUNKS = 3
+MAX_SCAN_WORKERS = 8
 DEFAULT_TRACE_PATH = ROOT / "logs" / "retrieval_trace.jsonl"
 WORD_RE = re.compile(r"[A-Za-z0-9]+")
+WORD_BYTES_RE = re.compile(rb"[A-Za-z0-9]+")
+PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n+")
+# A blank line holding spaces/tabs/CR; only these need PARAGRAPH_BREAK_RE's general matching.
+PADDED_BLANK_LINE_RE = re.compile(r"\n[^\S\n]+\n")
 
 
 @dataclass
@@ -53,36 +64,85 @@ def _tokenize(text: str) -> list[str]:
     return WORD_RE.findall(text.lower())
 
 
-def _score_text(text: str, query_tokens: set[str]) -> int:
+def _score_span(lower_text: str, start: int, end: int, query_tokens: set[str]) -> int:
+    if not query_tokens:
+        return 0
+    # Counter tallies in C; the Python-level loop then only runs over the (small) query set.
+    counts = Counter(WORD_RE.findall(lower_text, start, end))
+    return sum(counts[token] for token in query_tokens)
+
+
+def _score_span_bytes(lower_raw: bytes, start: int, end: int, query_tokens: set[bytes]) -> int:
     if not query_tokens:
         return 0
-    tokens = _tokenize(text)
-    return sum(1 for token in tokens if token in query_tokens)
+    counts = Counter(WORD_BYTES_RE.findall(lower_raw, start, end))
+    return sum(counts[token] for token in query_tokens)
 
 
-def _safe_read(path: Path) -> str:
+def _score_text(text: str, query_tokens: set[str]) -> int:
+    lower = text.lower()
+    return _score_span(lower, 0, len(lower), query_tokens)
+
+
+def _safe_read_bytes(path: Path) -> bytes:
     try:
-        return path.read_text(encoding="utf-8", errors="replace")
+        raw = path.read_bytes()
     except OSError:
-        return ""
+        return b""
+    # Match text-mode universal newlines; CR never occurs inside a multi-byte UTF-8 sequence.
+    if b"\r" in raw:
+        raw = raw.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    return raw
 
 
 def _clean_text(text: str) -> str:
     return " ".join(part.strip() for part in text.splitlines() if part.strip())
 
 
-def _split_chunks(text: str) -> list[str]:
-    paragraphs = [p.strip() for p in re.split(r"\n\s*\n+", text) if p.strip()]
-    chunks: list[str] = []
-    for para in paragraphs:
-        if len(para) <= MAX_CHUNK_CHARS:
-            chunks.append(para)
+def _strip_span(text: str, start: int, end: int) -> tuple[int, int]:
+    segment = text[start:end]
+    stripped = segment.lstrip()
+    start += len(segment) - len(stripped)
+    return start, start + len(stripped.rstrip())
+
+
+def _paragraph_breaks(text: str) -> list[tuple[int, int]]:
+    if PADDED_BLANK_LINE_RE.search(text) is not None:
+        return [(m.start(), m.end()) for m in PARAGRAPH_BREAK_RE.finditer(text)]
+    # Every blank line is a bare "\n\n": str.split finds the same breaks without the regex VM.
+    # Longer newline runs yield empty or newline-led pieces, which the caller strips away.
+    breaks: list[tuple[int, int]] = []
+    cursor = 0
+    for piece in text.split("\n\n")[:-1]:
+        cursor += len(piece)
+        breaks.append((cursor, cursor + 2))
+        cursor += 2
+    return breaks
+
+
+def _split_chunk_spans(text: str) -> list[tuple[int, int]]:
+    """Return (start, end) offsets of the stripped paragraph chunks in `text`."""
+    breaks = _paragraph_breaks(text)
+    breaks.append((len(text), len(text)))
+    spans: list[tuple[int, int]] = []
+    cursor = 0
+    for break_start, break_end in breaks:
+        start, end = _strip_span(text, cursor, break_start)
+        cursor = break_end
+        if start == end:
+            continue
+        if end - start <= MAX_CHUNK_CHARS:
+            spans.append((start, end))
             continue
-        for idx in range(0, len(para), MAX_CHUNK_CHARS):
-            chunk = para[idx : idx + MAX_CHUNK_CHARS].strip()
-            if chunk:
-                chunks.append(chunk)
-    return chunks
+        for idx in range(start, end, MAX_CHUNK_CHARS):
+            piece = _strip_span(text, idx, min(idx + MAX_CHUNK_CHARS, end))
+            if piece[0] < piece[1]:
+                spans.append(piece)
+    return spans
+
+
+def _split_chunks(text: str) -> list[str]:
+    return [text[start:end] for start, end in _split_chunk_spans(text)]
 
 
 def _iter_project_dirs(memory_root: Path) -> list[Path]:
@@ -103,41 +163,80 @@ def _iter_project_dirs(memory_root: Path) -> list[Path]:
     return candidates
 
 
-def _iter_files(root: Path) -> list[Path]:
-    files: list[Path] = []
-    if root.is_file():
-        return [root]
-    for path in root.rglob("*"):
-        if path.is_dir():
-            continue
-        if any(part.startswith(".") for part in path.parts):
-            continue
-        if path.name in EXCLUDED_NAMES:
-            continue
-        if path.suffix and path.suffix.lower() not in ALLOWED_SUFFIXES:
-            continue
+def _walk_files(root: Path) -> Iterator[Path]:
+    # os.scandir reuses the dirent type info and caches stat(), so each entry costs at most one syscall.
+    # Constants and helpers are bound to locals: the entry loop is the hottest in the module.
+    allowed_suffixes = ALLOWED_SUFFIXES
+    excluded_names = EXCLUDED_NAMES
+    max_bytes = MAX_FILE_BYTES
+    splitext = os.path.splitext
+    pending = [str(root)]
+    while pending:
         try:
-            if path.stat().st_size > MAX_FILE_BYTES:
-                continue
+            scanner = os.scandir(pending.pop())
         except OSError:
             continue
-        files.append(path)
-    return files
+        with scanner:
+            for entry in scanner:
+                name = entry.name
+                if name.startswith(".") or name in excluded_names:
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    suffix = splitext(name)[1]
+                    if suffix and suffix.lower() not in allowed_suffixes:
+                        continue
+                    if entry.stat().st_size > max_bytes:
+                        continue
+                except OSError:
+                    continue
+                yield Path(entry.path)
+
+
+def _iter_files(root: Path) -> list[Path]:
+    if root.is_file():
+        return [root]
+    return list(_walk_files(root))
 
 
 def _collect_project(project_path: Path, project_name: str, query_tokens: set[str]) -> ProjectRecall:
     chunks: list[Chunk] = []
+    query_bytes = {token.encode("utf-8") for token in query_tokens}
     for file_path in _iter_files(project_path):
-        text = _safe_read(file_path)
+        raw = _safe_read_bytes(file_path)
+        text = raw.decode("utf-8", errors="replace")
         if not text.strip():
             continue
         relative = file_path.relative_to(ROOT).as_posix()
-        for idx, chunk_text in enumerate(_split_chunks(text)):
-            cleaned = _clean_text(chunk_text)
-            if not cleaned:
-                continue
-            chunk = Chunk(project=project_name, file=relative, index=idx, text=cleaned)
-            chunk.score = _score_text(cleaned, query_tokens)
+        # Lowercase the file once and score each chunk in place by offset. ASCII files (the common
+        # case) score on the bytes, where offsets match the text and the bytes regex is cheaper.
+        # Rare characters whose lowercase form changes length would shift offsets, so such files
+        # score per chunk.
+        ascii_only = raw.isascii()
+        lower_raw = raw.lower() if ascii_only else b""
+        lower = "" if ascii_only else text.lower()
+        fused = len(lower) == len(text)
+        # One C-level substring scan: a file containing no query token scores 0 in every chunk,
+        # so its chunks are still listed (they may be rendered) but never tokenized.
+        if ascii_only:
+            has_hits = any(token in lower_raw for token in query_bytes)
+        else:
+            has_hits = any(token in lower for token in query_tokens)
+        # Chunks keep the raw slice; only the few rendered ones are ever cleaned.
+        for idx, (start, end) in enumerate(_split_chunk_spans(text)):
+            chunk = Chunk(project=project_name, file=relative, index=idx, text=text[start:end])
+            if not has_hits:
+                pass
+            elif ascii_only:
+                chunk.score = _score_span_bytes(lower_raw, start, end, query_bytes)
+            elif fused:
+                chunk.score = _score_span(lower, start, end, query_tokens)
+            else:
+                chunk.score = _score_text(chunk.text, query_tokens)
             chunks.append(chunk)
     project = ProjectRecall(name=project_name, path=project_path, chunks=chunks)
     if chunks:
@@ -203,35 +302,59 @@ def _append_trace(
             }
         )
 
+    payload = "".join(json.dumps(entry, ensure_ascii=True) + "\n" for entry in entries).encode("utf-8")
     try:
-        with trace_path.open("a", encoding="utf-8") as handle:
-            for entry in entries:
-                handle.write(json.dumps(entry, ensure_ascii=True) + "\n")
+        fd = os.open(trace_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
     except OSError:
         return
+    try:
+        os.write(fd, payload)
+    except OSError:
+        return
+    finally:
+        os.close(fd)
 
 
-def render_markdown(query: str, projects: list[ProjectRecall]) -> str:
-    lines: list[str] = []
-    lines.append("# Para Recall")
-    lines.append(f"- Query: `{query}`")
-    lines.append(f"- Projects scanned: {len(projects)}")
+def iter_markdown_lines(query: str, projects: list[ProjectRecall]) -> Iterator[str]:
+    yield "# Para Recall"
+    yield f"- Query: `{query}`"
+    yield f"- Projects scanned: {len(projects)}"
     if not projects:
-        lines.append("")
-        lines.append("No memory found.")
-        return "\n".join(lines)
+        yield ""
+        yield "No memory found."
+        return
 
     for project in projects:
-        lines.append("")
-        lines.append(f"## {project.name} (score {project.score})")
+        yield ""
+        yield f"## {project.name} (score {project.score})"
         chunks = _select_chunks(project, DEFAULT_TOP_CHUNKS)
         if not chunks:
-            lines.append("- No chunks available.")
+            yield "- No chunks available."
             continue
         for chunk in chunks:
-            snippet = _truncate(chunk.text, MAX_SNIPPET_CHARS)
-            lines.append(f"- `{chunk.file}` (score {chunk.score}): {snippet}")
-    return "\n".join(lines)
+            snippet = _truncate(_clean_text(chunk.text), MAX_SNIPPET_CHARS)
+            yield f"- `{chunk.file}` (score {chunk.score}): {snippet}"
+
+
+def render_markdown(query: str, projects: list[ProjectRecall]) -> str:
+    return "\n".join(iter_markdown_lines(query, projects))
+
+
+def _write_lines(lines: Iterator[str]) -> None:
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        for line in lines:
+            sys.stdout.write(line + "\n")
+        return
+    sys.stdout.flush()
+    try:
+        for line in lines:
+            # surrogateescape round-trips undecodable file names back to their original bytes.
+            buffer.write(line.encode("utf-8", "surrogateescape") + b"\n")
+        buffer.flush()
+    except BrokenPipeError:
+        # The reader (e.g. `head`) went away; point stdout at devnull so the exit-time flush stays quiet.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -257,10 +380,15 @@ def main(argv: list[str] | None = None) -> int:
 
     query_tokens = set(_tokenize(query))
     project_paths = _iter_project_dirs(MEMORY_ROOT)
-    projects: list[ProjectRecall] = []
-    for path in project_paths:
-        name = path.name if path != MEMORY_ROOT else "memory-root"
-        projects.append(_collect_project(path, name, query_tokens))
+    names = [path.name if path != MEMORY_ROOT else "memory-root" for path in project_paths]
+    projects: list[ProjectRecall]
+    if len(project_paths) <= 1:
+        projects = [_collect_project(path, name, query_tokens) for path, name in zip(project_paths, names)]
+    else:
+        # Projects are independent trees; map() keeps results in project order.
+        workers = min(MAX_SCAN_WORKERS, len(project_paths), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            projects = list(pool.map(_collect_project, project_paths, names, [query_tokens] * len(project_paths)))
 
     top_projects = _select_projects(projects, max(1, args.top_projects))
     selected_chunks: list[Chunk] = []
@@ -268,8 +396,7 @@ def main(argv: list[str] | None = None) -> int:
         selected_chunks.extend(_select_chunks(project, DEFAULT_TOP_CHUNKS))
     if args.trace:
         _append_trace(Path(args.trace), query, selected_chunks, top_projects)
-    output = render_markdown(query, top_projects)
-    print(output)
+    _write_lines(iter_markdown_lines(query, top_projects))
     return 0
 
 
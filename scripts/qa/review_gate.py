@@ -8,10 +8,12 @@ import sys
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[2]
+STATUS_PATH = ROOT / "agent" / "STATUS.json"
+PR_TEMPLATE_PATH = ROOT / ".github" / "pull_request_template.md"
 
 REQUIRED_FILES = [
     ROOT / "docs" / "QUALITY_GATES.md",
-    ROOT / ".github" / "pull_request_template.md",
+    PR_TEMPLATE_PATH,
 ]
 
 REQUIRED_CHECKLIST_ITEMS = [
@@ -22,53 +24,51 @@ REQUIRED_CHECKLIST_ITEMS = [
 ]
 
 
-def _read(path: Path) -> str:
+def _read_bytes(path: Path) -> bytes | None:
     try:
-        return path.read_text(encoding="utf-8")
+        return path.read_bytes()
     except OSError:
-        return ""
+        return None
 
 
-def _validate_status_json() -> list[str]:
-    issues: list[str] = []
-    status_path = ROOT / "agent" / "STATUS.json"
-    if not status_path.exists():
-        issues.append("Missing agent/STATUS.json")
-        return issues
+def _validate_status_json(raw: bytes | None) -> list[str]:
+    if raw is None:
+        return ["Missing agent/STATUS.json"]
     try:
-        payload = json.loads(_read(status_path))
-    except json.JSONDecodeError:
-        issues.append("agent/STATUS.json is not valid JSON")
-        return issues
+        # json.loads detects the encoding of raw bytes, so the file is never decoded to str first.
+        payload = json.loads(raw)
+    except ValueError:
+        return ["agent/STATUS.json is not valid JSON"]
     if not isinstance(payload, dict):
-        issues.append("agent/STATUS.json must be a JSON object")
-    return issues
+        return ["agent/STATUS.json must be a JSON object"]
+    return []
 
 
-def _validate_files() -> list[str]:
+def _validate_files(contents: dict[Path, bytes | None]) -> list[str]:
     issues: list[str] = []
     for path in REQUIRED_FILES:
-        if not path.exists():
+        if contents[path] is None:
             issues.append(f"Missing required file: {path.relative_to(ROOT)}")
     return issues
 
 
-def _validate_pr_template() -> list[str]:
+def _validate_pr_template(template: bytes | None) -> list[str]:
     issues: list[str] = []
-    template = _read(ROOT / ".github" / "pull_request_template.md")
     if not template:
         return ["Pull request template is missing or empty"]
     for item in REQUIRED_CHECKLIST_ITEMS:
-        if item not in template:
+        if item.encode("utf-8") not in template:
             issues.append(f"PR template missing checklist item: {item}")
     return issues
 
 
 def main() -> int:
+    # Each file is opened once; a missing or unreadable file maps to None.
+    contents = {path: _read_bytes(path) for path in (*REQUIRED_FILES, STATUS_PATH)}
     issues: list[str] = []
-    issues.extend(_validate_status_json())
-    issues.extend(_validate_files())
-    issues.extend(_validate_pr_template())
+    issues.extend(_validate_status_json(contents[STATUS_PATH]))
+    issues.extend(_validate_files(contents))
+    issues.extend(_validate_pr_template(contents[PR_TEMPLATE_PATH]))
 
     if issues:
         for issue in issues:
@@ -4,7 +4,11 @@
 from __future__ import annotations
 
 import argparse
+import atexit
 import json
+import os
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -13,17 +17,33 @@ DEFAULT_APPROVALS = {
     "publish_external": False,
     "service_restart": False,
 }
+# json.dumps builds a fresh encoder whenever non-default options are passed; reuse one per process.
+_JSONL_ENCODER = json.JSONEncoder(ensure_ascii=False)
+_PRETTY_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
 
+# Audit logs stay open for the life of the process: path -> (fd, inode at open time).
+_APPEND_FDS: dict[str, tuple[int, int]] = {}
+_APPEND_FDS_LOCK = threading.Lock()
+# (epoch second, formatted timestamp) of the last now_iso call.
+_LAST_TS: tuple[int, str] = (-1, "")
 
-def _now_iso() -> str:
-    return datetime.now().isoformat(timespec="seconds")
+
+def now_iso() -> str:
+    global _LAST_TS
+    sec = int(time.time())
+    last = _LAST_TS
+    if last[0] == sec:
+        return last[1]
+    formatted = datetime.fromtimestamp(sec).isoformat(timespec="seconds")
+    _LAST_TS = (sec, formatted)
+    return formatted
 
 
 def read_approvals(path: Path) -> dict:
     if not path.exists():
         return dict(DEFAULT_APPROVALS)
     try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
+        payload = json.loads(path.read_bytes())
     except (OSError, json.JSONDecodeError):
         return dict(DEFAULT_APPROVALS)
     if not isinstance(payload, dict):
@@ -43,7 +63,7 @@ def write_approvals(path: Path, approvals: dict) -> None:
     payload = dict(DEFAULT_APPROVALS)
     payload.update(normalized)
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    path.write_bytes((_PRETTY_ENCODER.encode(payload) + "\n").encode("utf-8"))
 
 
 def set_approval(path: Path, action: str, allow: bool) -> dict:
@@ -58,6 +78,34 @@ def is_action_approved(path: Path, action: str) -> bool:
     return bool(approvals.get(action.strip(), False))
 
 
+def _append_fd(path: Path) -> int:
+    key = str(path)
+    with _APPEND_FDS_LOCK:
+        cached = _APPEND_FDS.get(key)
+        if cached is not None:
+            fd, inode = cached
+            try:
+                if os.stat(key).st_ino == inode:
+                    return fd
+            except OSError:
+                pass
+            # Rotated or removed underneath us: reopen so records land in the live file.
+            os.close(fd)
+            del _APPEND_FDS[key]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(key, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        _APPEND_FDS[key] = (fd, os.fstat(fd).st_ino)
+        return fd
+
+
+@atexit.register
+def _close_append_fds() -> None:
+    with _APPEND_FDS_LOCK:
+        for fd, _ in _APPEND_FDS.values():
+            os.close(fd)
+        _APPEND_FDS.clear()
+
+
 def append_audit_log(
     log_path: Path,
     *,
@@ -67,16 +115,20 @@ def append_audit_log(
     metadata: dict | None = None,
 ) -> None:
     record: dict[str, object] = {
-        "timestamp": _now_iso(),
+        "timestamp": now_iso(),
         "event": event,
         "outcome": outcome,
         "detail": detail,
     }
     if isinstance(metadata, dict) and metadata:
         record["metadata"] = metadata
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    with log_path.open("a", encoding="utf-8") as fh:
-        fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+    append_jsonl(log_path, record)
+
+
+def append_jsonl(log_path: Path, record: dict) -> None:
+    """Append one JSON line through the process-wide cached append fd."""
+    # O_APPEND makes each single-write record atomic with respect to other appenders.
+    os.write(_append_fd(log_path), (_JSONL_ENCODER.encode(record) + "\n").encode("utf-8"))
 
 
 def parse_args() -> argparse.Namespace:
@@ -4,67 +4,220 @@
 from __future__ import annotations
 
 import argparse
-import datetime as dt
+import mmap
 import os
 import re
-from typing import Iterable, List
+import sys
+import time
+from typing import BinaryIO, Iterable, Iterator, List, Sequence, Tuple
 
 DEFAULT_INPUT = "agent/test_tail.log"
 DEFAULT_OUTPUT = "agent/session_ends.md"
 DEFAULT_MAX_LINES = 50
+TAIL_BLOCK_BYTES = 64 * 1024
+MAX_SIGNALS = 5
+# Linux/BSD limit on buffers per writev call; larger batches fall back to a joined write.
+IOV_MAX = 1024
+NO_SIGNALS_MESSAGE = "No error or warning signals detected in tail."
 
 
-SIGNAL_PATTERN = re.compile(
-    r"\b(error|failed|failure|exception|traceback|warn|warning|fatal)\b",
-    re.IGNORECASE,
-)
+SIGNAL_WORDS = ("error", "failed", "failure", "exception", "traceback", "warn", "warning", "fatal")
+SIGNAL_PATTERN = re.compile(r"\b(" + "|".join(SIGNAL_WORDS) + r")\b", re.IGNORECASE)
+# Substrings every SIGNAL_PATTERN match must contain once lowercased ("fail" covers failed/failure,
+# "warn" covers warning). Only valid for ASCII text: IGNORECASE also folds a few non-ASCII letters.
+SIGNAL_KEYWORDS = ("error", "fail", "exception", "traceback", "warn", "fatal")
+# Signal words grouped under their shared stem, so one substring search serves the whole group.
+SIGNAL_WORDS_BY_STEM = {stem: tuple(word for word in SIGNAL_WORDS if word.startswith(stem)) for stem in SIGNAL_KEYWORDS}
+
+
+def _tail_bytes_mmap(handle: BinaryIO, max_lines: int) -> bytes | None:
+    """Slice the tail straight out of the page cache; None when the file cannot be mapped."""
+    if os.name == "nt" or os.fstat(handle.fileno()).st_size == 0:
+        return None
+    try:
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            pos = len(mapped)
+            # Cut just after the (max_lines + 1)-th newline from the end, like `tail -n`.
+            for _ in range(max_lines + 1):
+                pos = mapped.rfind(b"\n", 0, pos)
+                if pos < 0:
+                    break
+            return mapped[pos + 1 :]
+    except (OSError, ValueError):
+        return None
+
+
+def _tail_bytes_blocks(handle: BinaryIO, max_lines: int) -> bytes:
+    try:
+        pos = handle.seek(0, os.SEEK_END)
+    except OSError:
+        # Pipes and some /proc files cannot seek from the end; read them through instead.
+        return handle.read()
+    blocks: List[bytes] = []
+    newlines = 0
+    # Read backwards: max_lines + 1 newlines guarantee the oldest kept line is complete.
+    while pos > 0 and newlines <= max_lines:
+        step = min(TAIL_BLOCK_BYTES, pos)
+        pos -= step
+        handle.seek(pos)
+        block = handle.read(step)
+        newlines += block.count(b"\n")
+        blocks.append(block)
+    return b"".join(reversed(blocks))
 
 
 def read_tail(path: str, max_lines: int) -> List[str]:
     if max_lines <= 0:
         return []
+    # The cost depends on the tail size, not the log size. mmap avoids copying the scanned
+    # region; the block reader covers platforms and files (pipes, /proc) that cannot be mapped.
     try:
-        with open(path, "r", encoding="utf-8") as handle:
-            lines = handle.read().splitlines()
+        with open(path, "rb") as handle:
+            data = _tail_bytes_mmap(handle, max_lines)
+            if data is None:
+                data = _tail_bytes_blocks(handle, max_lines)
     except FileNotFoundError:
         return []
-    return lines[-max_lines:]
+    return data.decode("utf-8", errors="replace").splitlines()[-max_lines:]
 
 
 def compact_line(line: str, limit: int = 200) -> str:
-    trimmed = line.strip()
+    return _compact(line.strip(), limit)
+
+
+def _compact(trimmed: str, limit: int = 200) -> str:
+    """compact_line for text the caller has already stripped."""
     if len(trimmed) <= limit:
         return trimmed
     return trimmed[: limit - 3].rstrip() + "..."
 
 
-def summarize_context(lines: Iterable[str], input_path: str, max_lines: int) -> str:
-    non_empty = [line for line in lines if line.strip()]
-    last_line = compact_line(non_empty[-1]) if non_empty else "No log lines found."
+def _format_context(last: str | None, input_path: str, max_lines: int) -> str:
+    # `last` arrives stripped from both callers.
+    last_line = _compact(last) if last is not None else "No log lines found."
     return (
         f"Input: {input_path} (last {max_lines} lines). "
         f"Last line: {last_line}"
     )
 
 
-def summarize_signals(lines: Iterable[str]) -> List[str]:
+def summarize_context(lines: Sequence[str], input_path: str, max_lines: int) -> str:
+    # Walk back from the end: only the trailing blank lines are inspected.
+    last = next((stripped for stripped in (line.strip() for line in reversed(lines)) if stripped), None)
+    return _format_context(last, input_path, max_lines)
+
+
+def _signal_lines(text: str) -> Iterator[str]:
+    """Yield the lines of `text` that contain a signal keyword, in order."""
+    # One regex sweep over the joined tail instead of a search call per line; each hit is
+    # widened to its enclosing line and the sweep resumes on the next line.
+    pos = 0
+    while True:
+        match = SIGNAL_PATTERN.search(text, pos)
+        if match is None:
+            return
+        start = text.rfind("\n", 0, match.start()) + 1
+        end = text.find("\n", match.end())
+        if end == -1:
+            end = len(text)
+        yield text[start:end]
+        pos = end + 1
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _ascii_signal_lines(text: str, lower: str) -> Iterator[str]:
+    """Like _signal_lines for ASCII text, using str.find on `lower` instead of the regex engine."""
+    size = len(lower)
+
+    def next_hit(stem: str, pos: int) -> int:
+        # First whole-word occurrence of any word under `stem` at or after `pos` (\b semantics),
+        # else `size`. Words sharing a stem (warn/warning, failed/failure) share one find() pass.
+        words = SIGNAL_WORDS_BY_STEM[stem]
+        idx = lower.find(stem, pos)
+        while idx != -1:
+            if idx == 0 or not _is_word_char(lower[idx - 1]):
+                for word in words:
+                    end = idx + len(word)
+                    if lower.startswith(word, idx) and (end == size or not _is_word_char(lower[end])):
+                        return idx
+            idx = lower.find(stem, idx + 1)
+        return size
+
+    # Each stem's next hit is cached and only re-searched once the sweep has moved past it.
+    hits = {stem: next_hit(stem, 0) for stem in SIGNAL_KEYWORDS}
+    while True:
+        first = min(hits.values())
+        if first == size:
+            return
+        start = lower.rfind("\n", 0, first) + 1
+        end = lower.find("\n", first)
+        if end == -1:
+            end = size
+        yield text[start:end]
+        for stem, hit in hits.items():
+            if hit <= end:
+                hits[stem] = next_hit(stem, end + 1)
+
+
+def _scan_signal_text(text: str) -> Tuple[List[str], bool]:
+    if text.isascii():
+        lower = text.lower()
+        # Most tails are clean: plain substring tests rule that out without scanning for words.
+        if not any(keyword in lower for keyword in SIGNAL_KEYWORDS):
+            return [NO_SIGNALS_MESSAGE], False
+        signal_lines = _ascii_signal_lines(text, lower)
+    else:
+        signal_lines = _signal_lines(text)
     signals = []
     seen = set()
-    for line in lines:
-        if not SIGNAL_PATTERN.search(line):
+    # Repeated log lines usually repeat verbatim, so exact repeats of the raw line are rejected
+    # before it is compacted or its case-folded key (the actual dedup rule) is built.
+    seen_raw = set()
+    for line in signal_lines:
+        if line in seen_raw:
             continue
+        seen_raw.add(line)
         compact = compact_line(line)
+        if not compact:
+            continue
         normalized = compact.lower()
-        if compact and normalized not in seen:
+        if normalized not in seen:
             seen.add(normalized)
             signals.append(compact)
+            if len(signals) >= MAX_SIGNALS:
+                break
     if not signals:
-        signals.append("No error or warning signals detected in tail.")
-    return signals[:5]
+        return [NO_SIGNALS_MESSAGE], False
+    return signals, True
+
+
+def scan_signals(lines: Iterable[str]) -> Tuple[List[str], bool]:
+    """Return the signal summary lines and whether any real signal was found."""
+    return _scan_signal_text("\n".join(lines))
+
+
+def summarize_tail(lines: Iterable[str], input_path: str, max_lines: int) -> Tuple[str, List[str], bool]:
+    """Return (context, signals, has_issue) from a single join of the tail."""
+    text = "\n".join(lines)
+    # rstrip drops trailing blank lines too, so the last remaining line is the last non-empty one.
+    stripped = text.rstrip()
+    last = stripped[stripped.rfind("\n") + 1 :].lstrip() if stripped else None
+    signals, has_issue = _scan_signal_text(text)
+    return _format_context(last, input_path, max_lines), signals, has_issue
+
+
+def summarize_signals(lines: Iterable[str]) -> List[str]:
+    return scan_signals(lines)[0]
 
 
 def summarize_next_step(signals: Iterable[str]) -> str:
-    has_issue = any("No error" not in signal for signal in signals)
+    return next_step_for(any("No error" not in signal for signal in signals))
+
+
+def next_step_for(has_issue: bool) -> str:
     if has_issue:
         return "Review the signals above and address any failing step before continuing."
     return "Proceed with the next planned milestone or verification step."
@@ -76,18 +229,52 @@ def build_block(
     signals: Iterable[str],
     next_step: str,
 ) -> str:
-    lines = [
-        f"## Session End ({timestamp} UTC)",
-        "",
-        "### Context",
-        f"- {context}",
-        "",
-        "### Key signals",
-    ]
-    for signal in signals:
-        lines.append(f"- {signal}")
-    lines.extend(["", "### Next step", f"- {next_step}", ""])
-    return "\n".join(lines)
+    signal_lines = "".join(f"- {signal}\n" for signal in signals)
+    return (
+        f"## Session End ({timestamp} UTC)\n"
+        "\n"
+        "### Context\n"
+        f"- {context}\n"
+        "\n"
+        "### Key signals\n"
+        f"{signal_lines}"
+        "\n"
+        "### Next step\n"
+        f"- {next_step}\n"
+    )
+
+
+def _open_append(path: str) -> int:
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    try:
+        return os.open(path, flags, 0o644)
+    except FileNotFoundError:
+        # Only the first run for a fresh output directory pays for makedirs.
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return os.open(path, flags, 0o644)
+
+
+def session_block(input_path: str, max_lines: int, timestamp: str) -> str:
+    """Summarize the tail of `input_path` into one session-end markdown block."""
+    tail_lines = read_tail(input_path, max_lines)
+    if tail_lines:
+        context, signals, has_issue = summarize_tail(tail_lines, input_path, max_lines)
+    else:
+        # Missing or empty log, or --max-lines <= 0: the summary is fixed, so skip the scan.
+        context, signals, has_issue = _format_context(None, input_path, max_lines), [NO_SIGNALS_MESSAGE], False
+    return build_block(timestamp, context, signals, next_step_for(has_issue))
+
+
+def _write_blocks(fd: int, blocks: List[bytes]) -> None:
+    total = sum(len(block) for block in blocks)
+    written = 0
+    if hasattr(os, "writev") and len(blocks) <= IOV_MAX:
+        written = os.writev(fd, blocks)
+    if written < total:
+        # No writev (Windows), too many blocks, or a short write: finish with plain writes.
+        rest = b"".join(blocks)[written:]
+        while rest:
+            rest = rest[os.write(fd, rest) :]
 
 
 def main() -> int:
@@ -95,18 +282,28 @@ def main() -> int:
     parser.add_argument("--input", default=DEFAULT_INPUT)
     parser.add_argument("--out", default=DEFAULT_OUTPUT)
     parser.add_argument("--max-lines", type=int, default=DEFAULT_MAX_LINES)
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Read log paths from stdin (one per line) and append one block per log; --input is ignored.",
+    )
     args = parser.parse_args()
 
-    tail_lines = read_tail(args.input, args.max_lines)
-    timestamp = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-    context = summarize_context(tail_lines, args.input, args.max_lines)
-    signals = summarize_signals(tail_lines)
-    next_step = summarize_next_step(signals)
-    block = build_block(timestamp, context, signals, next_step)
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    if args.batch:
+        inputs = [line.strip() for line in sys.stdin if line.strip()]
+    else:
+        inputs = [args.input]
+    blocks = [session_block(path, args.max_lines, timestamp).encode("utf-8") for path in inputs]
+    if not blocks:
+        return 0
 
-    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
-    with open(args.out, "a", encoding="utf-8") as handle:
-        handle.write(block)
+    # O_APPEND plus a single writev(2): no stdio buffer, and all blocks land in one append.
+    fd = _open_append(args.out)
+    try:
+        _write_blocks(fd, blocks)
+    finally:
+        os.close(fd)
 
     return 0
 
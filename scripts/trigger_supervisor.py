@@ -231,7 +231,10 @@ def main() -> int:
         "handoff": handoff_payload,
         "fingerprint": fingerprint,
     }
-    trigger_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    # The supervisor polls for TRIGGER.json, so publish it whole with a rename.
+    tmp_path = trigger_path.with_name(f"{trigger_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp_path, trigger_path)
 
     if args.no_kickstart:
         print(f"trigger: queued at {trigger_path}")
@@ -15,3 +15,23 @@ def test_should_skip_prefixed_path() -> None:
 
 def test_should_include_normal_code_path() -> None:
     assert autopr._should_skip("scripts/supervisor_loop.py", ("agent/",), {"openclaw.json"}) is False
+
+
+def test_parse_porcelain_status_handles_renames_and_untracked() -> None:
+    data = b" M scripts/a.py\x00R  new.py\x00old.py\x00?? notes/b.md\x00"
+    assert autopr.parse_porcelain_status(data) == [
+        (" M", "scripts/a.py"),
+        ("R ", "new.py"),
+        ("??", "notes/b.md"),
+    ]
+
+
+def test_parse_porcelain_status_drops_excluded_paths() -> None:
+    data = b"?? memory/today.md\x00 M agent/STATUS.json\x00 M scripts/a.py\x00"
+    entries = autopr.parse_porcelain_status(data, (b"memory/",), frozenset({b"agent/STATUS.json"}))
+    assert entries == [(" M", "scripts/a.py")]
+
+
+def test_paths_needing_add_skips_fully_staged_paths() -> None:
+    entries = [("M ", "a.py"), ("MM", "b.py"), ("??", "c.py"), (" D", "d.py")]
+    assert autopr.paths_needing_add(entries) == ["b.py", "c.py", "d.py"]
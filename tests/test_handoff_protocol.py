@@ -20,6 +20,32 @@ def test_validate_handoff_rejects_missing_required_field() -> None:
     assert any("rollback_plan" in err for err in errors)
 
 
+def test_validate_handoff_reports_errors_in_field_order() -> None:
+    payload = handoff.build_handoff_template("a", "b", "obj")
+    payload.update(
+        {
+            "version": "0.9",
+            "to_agent": "a",
+            "objective": "",
+            "priority": "urgent",
+            "created_at": "nope",
+            "tags": [""],
+            "metadata": [],
+        }
+    )
+    ok, errors = handoff.validate_handoff(payload)
+    assert not ok
+    assert errors == [
+        "version must be '1.0'",
+        "from_agent and to_agent must be different",
+        "objective must be a non-empty string",
+        "priority must be one of: ['critical', 'high', 'low', 'medium']",
+        "created_at must be ISO-8601 datetime",
+        "tags must be a string list when provided",
+        "metadata must be an object when provided",
+    ]
+
+
 def test_route_isolation_predicate() -> None:
     expected = handoff.route_key("discord", "engineer", "user-1")
     observed = handoff.route_key("discord", "engineer", "user-1")
@@ -36,3 +62,21 @@ def test_handoff_convergence_detects_ping_pong() -> None:
     ok, reason = handoff.evaluate_handoff_convergence(history, max_hops=8, ping_pong_limit=1)
     assert ok is False
     assert "ping-pong" in reason
+
+
+def test_handoff_convergence_reports_first_problem_in_history_order() -> None:
+    ping, pong = {"from_agent": "planner", "to_agent": "coder"}, {"from_agent": "coder", "to_agent": "planner"}
+    assert handoff.evaluate_handoff_convergence([ping, pong, ping, "junk"], ping_pong_limit=1) == (
+        False,
+        "ping-pong limit exceeded",
+    )
+    assert handoff.evaluate_handoff_convergence([ping, "junk", pong, ping], ping_pong_limit=1) == (
+        False,
+        "invalid handoff at index=1",
+    )
+
+
+def test_build_template_derives_id_and_created_at_from_one_clock_read() -> None:
+    payload = handoff.build_handoff_template("planner", "coder", "Ship feature A")
+    stamp = payload["handoff_id"].split("-", 1)[1]
+    assert payload["created_at"].replace("-", "").replace(":", "").replace("T", "-") == stamp
@@ -24,3 +24,25 @@ def test_init_namespace_creates_expected_files(tmp_path: Path) -> None:
     assert (paths["session_dir"] / ".gitkeep").exists()
     assert (paths["card_dir"] / ".gitkeep").exists()
     assert (paths["pack_dir"] / ".gitkeep").exists()
+
+
+def test_resolve_paths_keeps_symlinks_unless_requested(tmp_path: Path) -> None:
+    real = tmp_path / "real"
+    real.mkdir()
+    (tmp_path / "link").symlink_to(real)
+    namespace = memory_namespace.build_namespace("default", "main", "demo", "2026-02-18")
+    templates = {"global_memory_template": "link/sub/../MEMORY.md"}
+    lexical = memory_namespace.resolve_paths(str(tmp_path), namespace, templates=templates)
+    assert lexical["global_memory"] == tmp_path / "link" / "MEMORY.md"
+    resolved = memory_namespace.resolve_paths(str(tmp_path), namespace, templates=templates, resolve_symlinks=True)
+    assert resolved["global_memory"] == real.resolve() / "MEMORY.md"
+
+
+def test_init_namespace_keeps_existing_files_unless_forced(tmp_path: Path) -> None:
+    namespace = memory_namespace.build_namespace("default", "main", "demo", "2026-02-18")
+    paths = memory_namespace.init_namespace(str(tmp_path), namespace, force=False)
+    paths["global_memory"].write_text("custom\n", encoding="utf-8")
+    memory_namespace.init_namespace(str(tmp_path), namespace, force=False)
+    assert paths["global_memory"].read_text(encoding="utf-8") == "custom\n"
+    memory_namespace.init_namespace(str(tmp_path), namespace, force=True)
+    assert paths["global_memory"].read_text(encoding="utf-8").startswith("# Root Memory\n")
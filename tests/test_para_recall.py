@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+from pathlib import Path
+
+import pytest
+
 from tests.load_script import load_script_module
 
 para_recall = load_script_module("scripts/para_recall.py", "para_recall")
@@ -24,3 +28,12 @@ def test_render_markdown_contains_project_heading() -> None:
     project = para_recall.ProjectRecall(name="demo", path=para_recall.MEMORY_ROOT, chunks=[chunk], score=2)
     output = para_recall.render_markdown("alpha", [project])
     assert "## demo (score 2)" in output
+
+
+def test_collect_project_scores_ascii_and_unicode_files_alike(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(para_recall, "ROOT", tmp_path)
+    (tmp_path / "ascii.md").write_bytes(b"Alpha beta\r\n\r\nalpha ALPHA\n")
+    (tmp_path / "unicode.md").write_text("Alpha beta café\n\nalpha ALPHA\n", encoding="utf-8")
+    project = para_recall._collect_project(tmp_path, "demo", {"alpha"})
+    scores = {(chunk.file, chunk.index): chunk.score for chunk in project.chunks}
+    assert scores == {("ascii.md", 0): 1, ("ascii.md", 1): 2, ("unicode.md", 0): 1, ("unicode.md", 1): 2}
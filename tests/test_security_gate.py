@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from datetime import datetime
 from pathlib import Path
 
 from tests.load_script import load_script_module
@@ -30,3 +31,20 @@ def test_append_audit_log_writes_jsonl(tmp_path: Path) -> None:
     payload = json.loads(lines[0])
     assert payload["event"] == "autopr"
     assert payload["outcome"] == "denied"
+
+
+def test_append_audit_log_follows_rotated_file(tmp_path: Path) -> None:
+    log_path = tmp_path / "security_audit.jsonl"
+    security_gate.append_audit_log(log_path, event="first", outcome="ok", detail="")
+    log_path.rename(tmp_path / "security_audit.jsonl.1")
+    security_gate.append_audit_log(log_path, event="second", outcome="ok", detail="")
+    lines = log_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["event"] for line in lines] == ["second"]
+
+
+def test_now_iso_matches_isoformat_seconds() -> None:
+    before = datetime.now().isoformat(timespec="seconds")
+    stamp = security_gate.now_iso()
+    after = datetime.now().isoformat(timespec="seconds")
+    assert before <= stamp <= after
+    assert security_gate.now_iso() >= stamp
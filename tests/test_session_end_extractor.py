@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
 from tests.load_script import load_script_module
 
 extractor = load_script_module("scripts/session_end_extractor.py", "session_end_extractor")
@@ -32,3 +38,34 @@ def test_build_block_has_required_sections() -> None:
     assert "### Context" in block
     assert "### Key signals" in block
     assert "### Next step" in block
+
+
+def test_read_tail_returns_last_lines_across_blocks(tmp_path: Path) -> None:
+    log_path = tmp_path / "tail.log"
+    log_path.write_text("".join(f"line {idx}\n" for idx in range(20000)), encoding="utf-8")
+    assert extractor.read_tail(str(log_path), 3) == ["line 19997", "line 19998", "line 19999"]
+    assert extractor.read_tail(str(tmp_path / "missing.log"), 3) == []
+
+
+def test_scan_signals_reports_whether_issues_were_found() -> None:
+    signals, has_issue = extractor.scan_signals(["all good", "done"])
+    assert signals == [extractor.NO_SIGNALS_MESSAGE]
+    assert has_issue is False
+    signals, has_issue = extractor.scan_signals(["WARNING: No error handler registered"])
+    assert has_issue is True
+    assert "address any failing step" in extractor.next_step_for(has_issue)
+
+
+def test_main_batch_appends_one_block_per_log(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    first = tmp_path / "first.log"
+    first.write_text("ok\nERROR boom\n", encoding="utf-8")
+    second = tmp_path / "second.log"
+    second.write_text("all good\n", encoding="utf-8")
+    out_path = tmp_path / "out" / "session_ends.md"
+    monkeypatch.setattr(sys, "argv", ["session_end_extractor.py", "--batch", "--out", str(out_path)])
+    monkeypatch.setattr(sys, "stdin", io.StringIO(f"{first}\n\n{second}\n"))
+    assert extractor.main() == 0
+    text = out_path.read_text(encoding="utf-8")
+    assert text.count("## Session End (") == 2
+    assert "- ERROR boom" in text
+    assert f"Input: {second} (last 50 lines). Last line: all good" in text
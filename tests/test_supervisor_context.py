@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import os
+import subprocess
 from pathlib import Path
 
+import pytest
+
 from tests.load_script import load_script_module
 
 supervisor = load_script_module("scripts/supervisor_loop.py", "supervisor_loop_ctx")
@@ -127,3 +131,149 @@ def test_build_second_brain_context_strict_namespace_isolation(tmp_path: Path) -
     assert "project-a" in context
     assert "project-b private" not in context
     assert "session_0900_b.md" not in context
+
+
+def test_build_second_brain_context_reuses_until_file_changes(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    today = supervisor.datetime.now().strftime("%Y-%m-%d")
+    daily = repo / "90_Memory" / today / "_DAILY_INDEX.md"
+    daily.parent.mkdir(parents=True, exist_ok=True)
+    daily.write_text("Decision: first\n", encoding="utf-8")
+    cfg = {
+        "enabled": True,
+        "root": ".",
+        "daily_index_template": "90_Memory/{date}/_DAILY_INDEX.md",
+        "session_glob_template": "90_Memory/{date}/session_*.md",
+        "include_memory_md": False,
+    }
+    namespace = {"tenant_id": "default", "agent_id": "main", "project_id": "demo"}
+
+    first = supervisor.build_second_brain_context(repo, cfg, namespace)
+    assert "Decision: first" in first
+    assert supervisor.build_second_brain_context(repo, cfg, namespace) is first
+
+    # Same size and same mtime: only the new inode from the atomic replace tells the versions apart.
+    mtime_ns = daily.stat().st_mtime_ns
+    replacement = daily.with_name("next.md")
+    replacement.write_text("Decision: fresh\n", encoding="utf-8")
+    os.utime(replacement, ns=(mtime_ns, mtime_ns))
+    os.replace(replacement, daily)
+    assert "Decision: fresh" in supervisor.build_second_brain_context(repo, cfg, namespace)
+
+
+def test_safe_read_tail_starts_on_whole_line(tmp_path: Path) -> None:
+    path = tmp_path / "session_big.md"
+    path.write_text("".join(f"line {index}\n" for index in range(1000)) + "Next: tail step\n", encoding="utf-8")
+    tail = supervisor._safe_read_tail(path, 64)
+    assert tail.endswith("Next: tail step\n")
+    assert tail.startswith("line ")
+    assert len(tail.encode("utf-8")) <= 64
+    assert supervisor._safe_read_tail(tmp_path / "missing.md", 64) == ""
+
+
+def test_parse_numstat_handles_renames_and_binary() -> None:
+    raw = "3\t1\tscripts/a.py\0-\t-\tassets/logo.png\0" "2\t0\t\0old name.md\0new name.md\0"
+    assert supervisor._parse_numstat(raw) == [
+        ("3", "1", "scripts/a.py"),
+        ("-", "-", "assets/logo.png"),
+        ("2", "0", "new name.md"),
+    ]
+
+
+def test_collect_diff_appends_totals_line(monkeypatch) -> None:
+    raw = "3\t1\tscripts/a.py\0-\t-\tassets/logo.png\0"
+    monkeypatch.setattr(supervisor, "_git_output", lambda repo, args: (0, raw))
+    changed, stat, written = supervisor.collect_diff(Path("."), ".")
+    assert written
+    assert changed == "scripts/a.py, assets/logo.png"
+    assert stat.splitlines()[-1] == "2 files changed, +3 -1"
+
+
+def test_run_workspace_tests_runs_each_shard(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    agent_dir = repo / "agent"
+    agent_dir.mkdir(parents=True)
+    (repo / "run_tests.py").write_text(
+        "import os, sys\n"
+        "shard = os.environ['OPENCLAW_TEST_SHARD']\n"
+        "print('ran', shard)\n"
+        "sys.exit(3 if shard == '2/3' else 0)\n",
+        encoding="utf-8",
+    )
+    summary, ok = supervisor.run_workspace_tests(repo, agent_dir, timeout_s=60, shards=3)
+    assert (summary, ok) == ("run_tests.py: FAILED(exit=3)", False)
+    tail = (agent_dir / "run_tests_tail.log").read_text(encoding="utf-8").splitlines()
+    assert tail == ["[shard 1/3] ran 1/3", "[shard 2/3] ran 2/3", "[shard 3/3] ran 3/3"]
+
+
+def test_run_workspace_shard_skips_start_after_shared_deadline(tmp_path: Path) -> None:
+    marker = tmp_path / "ran.txt"
+    command = [supervisor.sys.executable, "-c", f"open({str(marker)!r}, 'w').close()"]
+    with pytest.raises(subprocess.TimeoutExpired):
+        supervisor._run_workspace_shard(tmp_path, command, 2, 2, supervisor.time.monotonic() - 1)
+    assert not marker.exists()
+
+
+def test_run_workspace_tests_keeps_tail_on_timeout(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    agent_dir = repo / "agent"
+    agent_dir.mkdir(parents=True)
+    (repo / "run_tests.py").write_text(
+        "import time\nprint('collected 3 items', flush=True)\ntime.sleep(30)\n",
+        encoding="utf-8",
+    )
+    summary, ok = supervisor.run_workspace_tests(repo, agent_dir, timeout_s=1, shards=1)
+    assert (summary, ok) == ("run_tests.py: timeout", False)
+    tail = (agent_dir / "run_tests_tail.log").read_text(encoding="utf-8")
+    assert tail == "collected 3 items\nrun_tests.py timed out\n"
+
+
+def test_run_workspace_tests_cached_reuses_pass_until_workspace_changes(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    agent_dir = repo / "agent"
+    agent_dir.mkdir(parents=True)
+    runs = tmp_path / "runs.txt"
+    (repo / "run_tests.py").write_text(
+        f"with open({str(runs)!r}, 'a') as handle:\n    handle.write('x')\n",
+        encoding="utf-8",
+    )
+    git = ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    subprocess.run([*git, "add", "run_tests.py"], check=True)
+    subprocess.run([*git, "commit", "-qm", "init"], check=True)
+
+    assert supervisor.run_workspace_tests_cached(repo, agent_dir) == ("run_tests.py: OK", True)
+    (agent_dir / "STATUS.json").write_text("{}", encoding="utf-8")
+    cached = supervisor.run_workspace_tests_cached(repo, agent_dir)
+    assert cached == ("run_tests.py: OK (cached, workspace unchanged)", True)
+    assert runs.read_text(encoding="utf-8") == "x"
+
+    (repo / "module.py").write_text("VALUE = 1\n", encoding="utf-8")
+    assert supervisor.run_workspace_tests_cached(repo, agent_dir) == ("run_tests.py: OK", True)
+    assert runs.read_text(encoding="utf-8") == "xx"
+
+    subprocess.run([*git, "add", "module.py"], check=True)
+    subprocess.run([*git, "commit", "-qm", "module"], check=True)
+    assert supervisor.run_workspace_tests_cached(repo, agent_dir) == ("run_tests.py: OK", True)
+    # A staged edit leaves the worktree matching the index but must still invalidate the pass.
+    (repo / "module.py").write_text("VALUE = 2\n", encoding="utf-8")
+    subprocess.run([*git, "add", "module.py"], check=True)
+    assert supervisor.run_workspace_tests_cached(repo, agent_dir) == ("run_tests.py: OK", True)
+    assert runs.read_text(encoding="utf-8") == "xxxx"
+
+
+def test_run_workspace_tests_cached_skips_tree_edited_during_run(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    agent_dir = repo / "agent"
+    agent_dir.mkdir(parents=True)
+    (repo / "run_tests.py").write_text(
+        "import pathlib, time\ntime.sleep(0.01)\npathlib.Path('edited.py').write_text(str(time.time_ns()))\n",
+        encoding="utf-8",
+    )
+    git = ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    subprocess.run([*git, "add", "run_tests.py"], check=True)
+    subprocess.run([*git, "commit", "-qm", "init"], check=True)
+
+    for _ in range(2):
+        assert supervisor.run_workspace_tests_cached(repo, agent_dir) == ("run_tests.py: OK", True)
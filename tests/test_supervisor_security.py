@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
 
 from tests.load_script import load_script_module
@@ -38,3 +39,138 @@ def test_build_security_context_contains_core_constraints() -> None:
     text = supervisor.build_security_context(config)
     assert "Allowed operation classes" in text
     assert "Blocked command patterns" in text
+
+
+def test_load_supervisor_config_reparses_after_rewrite(tmp_path: Path) -> None:
+    config_path = tmp_path / "openclaw.json"
+    config_path.write_text(json.dumps({"supervisor": {"default_scope": "a"}}), encoding="utf-8")
+    assert supervisor.resolve_scope(tmp_path, None) == "a"
+    assert supervisor.load_supervisor_config(tmp_path) is supervisor.load_supervisor_config(tmp_path)
+
+    config_path.write_text(json.dumps({"supervisor": {"default_scope": "bb"}}), encoding="utf-8")
+    assert supervisor.resolve_scope(tmp_path, None) == "bb"
+
+
+def test_load_status_returns_independent_copies(tmp_path: Path) -> None:
+    status_path = tmp_path / "STATUS.json"
+    status_path.write_text(json.dumps({"state": "idle"}), encoding="utf-8")
+    first = supervisor.load_status(status_path)
+    first["state"] = "running"
+    assert supervisor.load_status(status_path) == {"state": "idle"}
+
+
+def test_load_json_cached_sees_same_size_replace_within_one_mtime(tmp_path: Path) -> None:
+    path = tmp_path / "BLUEPRINT.json"
+    path.write_text('{"state": "running"}', encoding="utf-8")
+    assert supervisor._load_json_cached(path) == {"state": "running"}
+    mtime_ns = path.stat().st_mtime_ns
+    replacement = tmp_path / "next.json"
+    replacement.write_text('{"state": "blocked"}', encoding="utf-8")
+    os.utime(replacement, ns=(mtime_ns, mtime_ns))
+    os.replace(replacement, path)
+    assert supervisor._load_json_cached(path) == {"state": "blocked"}
+
+
+def test_save_status_replaces_file_atomically(tmp_path: Path) -> None:
+    status_path = tmp_path / "STATUS.json"
+    status_path.write_text("{}", encoding="utf-8")
+    supervisor.save_status(status_path, {"state": "running"})
+    assert supervisor.load_status(status_path)["state"] == "running"
+    assert [path.name for path in tmp_path.iterdir()] == ["STATUS.json"]
+
+
+def test_atomic_write_skips_identical_payload_unless_file_changed(tmp_path: Path) -> None:
+    path = tmp_path / "RESULT.md"
+    supervisor._atomic_write_bytes(path, b"same\n")
+    inode = path.stat().st_ino
+    supervisor._atomic_write_bytes(path, b"same\n")
+    assert path.stat().st_ino == inode
+    path.write_bytes(b"edited elsewhere\n")
+    supervisor._atomic_write_bytes(path, b"same\n")
+    assert path.read_bytes() == b"same\n"
+
+
+def test_upsert_task_goal_skips_unchanged_file(tmp_path: Path) -> None:
+    task_path = tmp_path / "TASK.md"
+    supervisor._upsert_task_goal(task_path, "ship it")
+    assert task_path.read_text(encoding="utf-8") == "# Task\n目标：ship it\n"
+    before = task_path.stat().st_mtime_ns
+    supervisor._upsert_task_goal(task_path, " ship it ")
+    assert task_path.stat().st_mtime_ns == before
+
+
+def test_get_step_uses_index_and_keeps_first_duplicate(tmp_path: Path) -> None:
+    steps = [{"id": 1, "name": "first"}, {"id": 1, "name": "dup"}, "junk", {"id": 2, "name": "second"}]
+    (tmp_path / "BLUEPRINT.json").write_text(json.dumps({"steps": steps}), encoding="utf-8")
+    blueprint = supervisor.load_blueprint(tmp_path)
+    assert supervisor.get_step(blueprint, 1)["name"] == "first"
+    assert supervisor.get_step(blueprint, 2)["name"] == "second"
+    assert supervisor.get_step(blueprint, 3) is None
+    assert "_by_id" not in blueprint
+    assert supervisor.get_step(supervisor.load_blueprint(tmp_path / "missing"), 4)["name"] == "finalize"
+
+
+def test_load_blueprint_reuses_parse_until_file_changes(tmp_path: Path) -> None:
+    path = tmp_path / "BLUEPRINT.json"
+    path.write_text(json.dumps({"steps": [{"id": 1, "name": "spec"}]}), encoding="utf-8")
+    first = supervisor.load_blueprint(tmp_path)
+    assert supervisor.load_blueprint(tmp_path) is first
+    path.write_text(json.dumps({"steps": [{"id": 1, "name": "spec v2"}]}), encoding="utf-8")
+    assert supervisor.get_step(supervisor.load_blueprint(tmp_path), 1)["name"] == "spec v2"
+
+
+def test_refresh_blueprint_keeps_last_good_plan_when_file_breaks(tmp_path: Path) -> None:
+    path = tmp_path / "BLUEPRINT.json"
+    path.write_text(json.dumps({"steps": [{"id": 1, "name": "spec"}, {"id": 2, "name": "ship"}]}), encoding="utf-8")
+    blueprint = supervisor.load_blueprint(tmp_path)
+
+    path.write_text('{"steps": [{"id": 1, "na', encoding="utf-8")
+    blueprint = supervisor.refresh_blueprint(tmp_path, blueprint)
+    assert supervisor.get_step(blueprint, 2)["name"] == "ship"
+
+    path.unlink()
+    blueprint = supervisor.refresh_blueprint(tmp_path, blueprint)
+    assert supervisor.get_step(blueprint, 2)["name"] == "ship"
+
+    path.write_text(json.dumps({"steps": [{"id": 2, "name": "ship v2"}]}), encoding="utf-8")
+    assert supervisor.get_step(supervisor.refresh_blueprint(tmp_path, blueprint), 2)["name"] == "ship v2"
+
+
+def test_load_supervisor_config_normalizes_malformed_sections(tmp_path: Path) -> None:
+    (tmp_path / "openclaw.json").write_text(json.dumps({"supervisor": {"security": ["bad"]}}), encoding="utf-8")
+    config = supervisor.load_supervisor_config(tmp_path)
+    assert config["supervisor"]["security"] == {}
+    assert config["supervisor"]["autopr"] == {}
+    assert supervisor.resolve_security_config(tmp_path)["audit_log"] == "logs/security_audit.jsonl"
+    (tmp_path / "openclaw.json").write_text("[1, 2]", encoding="utf-8")
+    assert supervisor.load_autopr_config(tmp_path)["enabled"] is False
+
+
+def test_idle_wait_returns_early_when_trigger_exists(tmp_path: Path) -> None:
+    (tmp_path / supervisor.TRIGGER_FILE).write_text("{}", encoding="utf-8")
+    started = supervisor.time.monotonic()
+    supervisor._idle_wait(tmp_path, 60)
+    assert supervisor.time.monotonic() - started < 1
+
+
+def test_load_trigger_payload_retries_half_written_file(tmp_path: Path) -> None:
+    trigger_path = tmp_path / supervisor.TRIGGER_FILE
+    trigger_path.write_text('{"task": "ship', encoding="utf-8")
+    assert supervisor.load_trigger_payload(tmp_path) == {}
+    assert trigger_path.exists()
+    # Unchanged since the failed read: _idle_wait sleeps its full budget instead of spinning.
+    started = supervisor.time.monotonic()
+    supervisor._idle_wait(tmp_path, 1)
+    assert supervisor.time.monotonic() - started >= 0.9
+
+    trigger_path.write_text('{"task": "ship it"}', encoding="utf-8")
+    assert supervisor.load_trigger_payload(tmp_path) == {"task": "ship it"}
+    assert not trigger_path.exists()
+
+
+def test_load_trigger_payload_drops_file_that_stays_unparseable(tmp_path: Path) -> None:
+    trigger_path = tmp_path / supervisor.TRIGGER_FILE
+    trigger_path.write_text("not json", encoding="utf-8")
+    assert supervisor.load_trigger_payload(tmp_path) == {}
+    assert supervisor.load_trigger_payload(tmp_path) == {}
+    assert not trigger_path.exists()